@@ -1,24 +1,110 @@
 """
 Azure Services Explorer for Malaysia West Region
-A Flask app that displays and answers questions about Azure services in Malaysia West.
+A Quart app that displays and answers questions about Azure services in Malaysia West.
 """
 
 import os
+import re
+import asyncio
 import json
-from flask import Flask, render_template, request, jsonify
+import bisect
+import tempfile
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import orjson
+from quart import Quart, Response, render_template, request
+from azure.core.exceptions import ClientAuthenticationError
 from azure.identity import DefaultAzureCredential, ManagedIdentityCredential
+from azure.identity.aio import (
+    DefaultAzureCredential as AsyncDefaultAzureCredential,
+    ManagedIdentityCredential as AsyncManagedIdentityCredential,
+    get_bearer_token_provider as get_async_bearer_token_provider,
+)
 from azure.mgmt.resource import ResourceManagementClient, SubscriptionClient
-import requests
 from dotenv import load_dotenv
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI
+
+try:
+    import ahocorasick
+except ImportError:  # Optional: keyword search falls back to scanning the token vocabulary
+    ahocorasick = None
 
 # Load environment variables from .env file (for local development)
 load_dotenv()
 
-app = Flask(__name__)
+app = Quart(__name__)
 
 # Cache for services data
 _services_cache = None
+_services_lock = threading.Lock()
+
+# Shared Azure OpenAI client, created lazily so the credential's token cache and the
+# HTTP connection pool are reused across requests
+_openai_client = None
+_openai_credential = None
+
+# Background refresh of the Azure OpenAI token. The token provider only renews a token in the
+# last 5 minutes before it expires, so polling more often than that keeps renewals off requests.
+_TOKEN_REFRESH_INTERVAL = 240
+_token_refresh_task = None
+
+# Views derived from the cached services, rebuilt together whenever the cache is set
+_search_index = None
+_system_prompt_cache = None
+_grouped_cache = {}
+_provider_count_cache = 0
+
+# Azure OpenAI answers keyed on (normalized question, services version), least recently used first.
+# The version is bumped whenever the services cache is replaced, so stale answers are never served.
+_ANSWER_CACHE_SIZE = 512
+_answer_cache = OrderedDict()
+_services_version = 0
+
+# On-disk cache so worker restarts and new instances skip the provider enumeration.
+# Set SERVICES_CACHE_PATH to an empty string to disable it.
+SERVICES_CACHE_PATH = os.environ.get(
+    "SERVICES_CACHE_PATH", os.path.join(tempfile.gettempdir(), "myw_services.json")
+)
+SERVICES_CACHE_TTL = int(os.environ.get("SERVICES_CACHE_TTL", 24 * 60 * 60))
+
+# Azure Resource Manager REST API used for the provider listing
+ARM_ENDPOINT = "https://management.azure.com"
+ARM_PROVIDERS_API_VERSION = "2022-09-01"
+ARM_MAX_RETRIES = 3
+ARM_MAX_RETRY_DELAY = 30
+_ARM_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+# A deployable resource type in the region. The lc_* fields are lowercased copies used by
+# search; only the first five fields are part of the JSON and disk cache representation.
+Service = namedtuple(
+    "Service",
+    "provider resource_type display_name is_available api_versions lc_provider lc_resource lc_display"
+)
+_SERVICE_JSON_FIELDS = Service._fields[:5]
+
+
+def _make_service(provider: str, resource_type: str, api_versions) -> Service:
+    """Build a Service record, keeping at most the first three API versions."""
+    display_name = f"{provider}/{resource_type}"
+    return Service(
+        provider,
+        resource_type,
+        display_name,
+        "Yes",
+        tuple(api_versions[:3]) if api_versions else (),
+        provider.lower(),
+        resource_type.lower(),
+        display_name.lower(),
+    )
+
+
+def _service_to_dict(service: Service) -> dict:
+    """Serialize a Service to its public JSON fields."""
+    return dict(zip(_SERVICE_JSON_FIELDS, service))
 
 
 def get_azure_credential():
@@ -37,6 +123,16 @@ def get_azure_credential():
         return DefaultAzureCredential()
 
 
+def get_async_azure_credential():
+    """Async counterpart of get_azure_credential, for use on the event loop."""
+    managed_identity_client_id = os.environ.get("AZURE_MANAGED_IDENTITY_CLIENT_ID")
+    
+    if managed_identity_client_id:
+        return AsyncManagedIdentityCredential(client_id=managed_identity_client_id)
+    else:
+        return AsyncDefaultAzureCredential()
+
+
 def get_deployable_resources_in_region(region: str = "Malaysia West"):
     """
     Fetch all deployable resource types available in a specific Azure region.
@@ -71,30 +167,22 @@ def get_deployable_resources_in_region(region: str = "Malaysia West"):
         if not subscription_id:
             raise Exception("No Azure subscription found. Please set AZURE_SUBSCRIPTION_ID environment variable.")
         
+        # Get all resource providers (equivalent to Get-AzResourceProvider) from the REST API and
+        # project the matching resource types straight into result rows
+        try:
+            results = []
+            for page in _prefetch_pages(_list_providers_rest(credential, subscription_id)):
+                results.extend(_resource_types_in_region_json(page, region))
+            return results
+        except Exception as e:
+            print(f"ARM REST provider listing failed, falling back to the SDK: {e}")
+        
         # Use ResourceManagementClient to get providers (equivalent to Get-AzResourceProvider)
         resource_client = ResourceManagementClient(credential, subscription_id)
         
-        # Initialize array to hold results (equivalent to $results = @())
         results = []
-        
-        # Get all resource providers (equivalent to Get-AzResourceProvider)
-        providers = resource_client.providers.list()
-        
-        for provider in providers:
-            namespace = provider.namespace  # equivalent to $provider.ProviderNamespace
-            
-            for resource_type in provider.resource_types or []:
-                locations = resource_type.locations or []  # equivalent to $resourceType.Locations
-                
-                # Check if region is in locations (equivalent to if ($locations -contains $region))
-                if region in locations:
-                    results.append({
-                        "provider": namespace,
-                        "resource_type": resource_type.resource_type,
-                        "display_name": f"{namespace}/{resource_type.resource_type}",
-                        "is_available": "Yes",
-                        "api_versions": resource_type.api_versions[:3] if resource_type.api_versions else []
-                    })
+        for page in _prefetch_pages(resource_client.providers.list().by_page()):
+            results.extend(_resource_types_in_region(page, region))
         
         return results
         
@@ -103,19 +191,174 @@ def get_deployable_resources_in_region(region: str = "Malaysia West"):
         raise
 
 
+def _list_providers_rest(credential, subscription_id: str):
+    """
+    Yield pages of raw provider JSON from the ARM providers REST API, following nextLink.
+    Skips the SDK's model objects, which dominate CPU time for this listing.
+    """
+    token = credential.get_token(f"{ARM_ENDPOINT}/.default").token
+    url = f"{ARM_ENDPOINT}/subscriptions/{subscription_id}/providers"
+    params = {"api-version": ARM_PROVIDERS_API_VERSION}
+    
+    # The transport retries failed connections; throttling and 5xx are retried per page below
+    transport = httpx.HTTPTransport(retries=ARM_MAX_RETRIES)
+    with httpx.Client(transport=transport, headers={"Authorization": f"Bearer {token}"}, timeout=60) as client:
+        while url:
+            response = _get_with_retry(client, url, params)
+            page = orjson.loads(response.content)
+            yield page.get("value", [])
+            # nextLink already carries the query string
+            url, params = page.get("nextLink"), None
+
+
+def _get_with_retry(client, url: str, params):
+    """
+    GET a page, retrying throttled (429) and transient 5xx responses up to ARM_MAX_RETRIES
+    times. Waits for Retry-After when ARM sends it, otherwise backs off exponentially.
+    """
+    for attempt in range(ARM_MAX_RETRIES + 1):
+        response = client.get(url, params=params)
+        if response.status_code not in _ARM_RETRY_STATUSES or attempt == ARM_MAX_RETRIES:
+            response.raise_for_status()
+            return response
+        
+        try:
+            delay = float(response.headers.get("Retry-After", 2 ** attempt))
+        except ValueError:
+            delay = 2 ** attempt
+        time.sleep(min(delay, ARM_MAX_RETRY_DELAY))
+
+
+def _prefetch_pages(pages):
+    """
+    Yield each page from an ARM page iterator as a list, fetching the next page on a
+    worker thread while the caller processes the current one.
+    """
+    pages = iter(pages)
+    
+    def fetch_next():
+        page = next(pages, None)
+        return None if page is None else list(page)
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = executor.submit(fetch_next)
+        while (page := pending.result()) is not None:
+            pending = executor.submit(fetch_next)
+            yield page
+
+
+def _resource_types_in_region(providers, region: str) -> list:
+    """
+    Project provider metadata into result rows for resource types available in a region.
+    Equivalent to the nested foreach/if in the PowerShell script, done in a single pass.
+    """
+    return [
+        _make_service(provider.namespace, resource_type.resource_type, resource_type.api_versions)
+        for provider in providers
+        for resource_type in provider.resource_types or []
+        if region in (resource_type.locations or [])
+    ]
+
+
+def _resource_types_in_region_json(providers: list, region: str) -> list:
+    """Like _resource_types_in_region, for providers parsed from the REST API's JSON."""
+    return [
+        _make_service(provider["namespace"], resource_type["resourceType"], resource_type.get("apiVersions"))
+        for provider in providers
+        for resource_type in provider.get("resourceTypes") or []
+        if region in (resource_type.get("locations") or [])
+    ]
+
+
+def _load_services_from_disk():
+    """Return services from the on-disk cache, or None if it is disabled, missing or stale."""
+    if not SERVICES_CACHE_PATH:
+        return None
+    
+    try:
+        if time.time() - os.stat(SERVICES_CACHE_PATH).st_mtime >= SERVICES_CACHE_TTL:
+            return None
+        with open(SERVICES_CACHE_PATH, encoding="utf-8") as f:
+            return [
+                _make_service(s["provider"], s["resource_type"], s["api_versions"])
+                for s in json.load(f)
+            ]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Ignoring services cache file: {e}")
+        return None
+
+
+def _save_services_to_disk(services: list):
+    """Atomically write services to the on-disk cache."""
+    if not SERVICES_CACHE_PATH:
+        return
+    
+    try:
+        directory = os.path.dirname(os.path.abspath(SERVICES_CACHE_PATH))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump([_service_to_dict(s) for s in services], f)
+            os.replace(tmp_path, SERVICES_CACHE_PATH)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        print(f"Could not write services cache file: {e}")
+
+
+def _cache_services(services: list):
+    """Store services in the in-memory cache along with the fields precomputed for search."""
+    global _services_cache, _search_index, _system_prompt_cache, _grouped_cache, _provider_count_cache
+    global _services_version
+    
+    _search_index = _SearchIndex(services)
+    _system_prompt_cache = _build_system_prompt(services)
+    _grouped_cache = _group_by_provider(services)
+    _provider_count_cache = len(_grouped_cache)
+    _services_version += 1
+    _answer_cache.clear()
+    _services_cache = services
+
+
+def _group_by_provider(services: list) -> dict:
+    """Group services by provider, preserving order."""
+    grouped = {}
+    for service in services:
+        provider = service.provider
+        if provider not in grouped:
+            grouped[provider] = []
+        grouped[provider].append(service)
+    return grouped
+
+
 def get_malaysia_west_services():
     """Fetch Azure services available in Malaysia West region."""
-    global _services_cache
-    
     if _services_cache is not None:
         return _services_cache
     
+    # Concurrent cold-start requests wait for a single load instead of each enumerating providers
+    with _services_lock:
+        if _services_cache is not None:
+            return _services_cache
+        return _load_services()
+
+
+def _load_services():
+    """Load services from the disk cache or Azure, populating the in-memory cache."""
+    services = _load_services_from_disk()
+    if services:
+        _cache_services(services)
+        print(f"Loaded {len(services)} resource types from {SERVICES_CACHE_PATH}")
+        return services
+    
     try:
         # Use the converted PowerShell function to get deployable resources
         services = get_deployable_resources_in_region("Malaysia West")
         
         if services:
-            _services_cache = services
+            _cache_services(services)
+            _save_services_to_disk(services)
             print(f"Successfully loaded {len(services)} resource types from Azure")
             return services
         else:
@@ -128,60 +371,91 @@ def get_malaysia_west_services():
         return []
 
 
-def get_ai_response(question: str, services: list) -> str:
-    """Generate AI response about Azure services in Malaysia West using Azure OpenAI."""
-    
-    # Get Azure OpenAI configuration from environment
-    endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
-    deployment = os.environ.get("AZURE_OPENAI_DEPLOYMENT", "gpt-5.2-chat")
-    managed_identity_client_id = os.environ.get("AZURE_MANAGED_IDENTITY_CLIENT_ID")
-    api_version = "2024-12-01-preview"
-    
-    if not endpoint:
-        # Fallback to rule-based response if no AI configured
-        return generate_simple_response(question, services)
+async def get_services_async():
+    """Return the cached services, loading them on a worker thread so the event loop stays free."""
+    if _services_cache is not None:
+        return _services_cache
+    return await asyncio.to_thread(get_malaysia_west_services)
+
+
+def _get_openai_client(endpoint: str):
+    """
+    Return the shared Azure OpenAI client, creating it on first use.
+    Only called on the event loop and never awaits, so creation needs no lock.
+    """
+    global _openai_client, _openai_credential, _token_refresh_task
     
-    try:
-        from azure.identity import get_bearer_token_provider
-        
-        # Use User-Assigned Managed Identity if client_id is provided
-        # Otherwise fall back to DefaultAzureCredential (for local dev)
-        if managed_identity_client_id:
-            credential = ManagedIdentityCredential(client_id=managed_identity_client_id)
-        else:
-            credential = DefaultAzureCredential()
-        
-        token_provider = get_bearer_token_provider(
-            credential,
+    if _openai_client is None:
+        # Async credential so token requests (IMDS, or az CLI locally) never block the event loop
+        _openai_credential = get_async_azure_credential()
+        token_provider = get_async_bearer_token_provider(
+            _openai_credential,
             "https://cognitiveservices.azure.com/.default"
         )
         
         # Initialize Azure OpenAI client with Azure AD auth
-        client = AzureOpenAI(
-            api_version=api_version,
+        _openai_client = AsyncAzureOpenAI(
+            api_version="2024-12-01-preview",
             azure_endpoint=endpoint,
             azure_ad_token_provider=token_provider,
         )
-        
-        # Group services by provider for better context
-        providers = {}
-        for s in services:
-            provider = s['provider']
-            if provider not in providers:
-                providers[provider] = []
-            providers[provider].append(s['resource_type'])
-        
-        # Create a comprehensive but concise service summary
-        provider_summary = []
-        for provider, resource_types in sorted(providers.items()):
-            types_str = ", ".join(resource_types[:5])
-            if len(resource_types) > 5:
-                types_str += f" (+{len(resource_types) - 5} more)"
-            provider_summary.append(f"- {provider}: {types_str}")
-        
-        service_context = "\n".join(provider_summary)
-        
-        system_prompt = f"""You are an Azure expert assistant helping users understand Azure services available in the Malaysia West region.
+        _token_refresh_task = asyncio.get_running_loop().create_task(
+            _refresh_token_periodically(token_provider)
+        )
+    
+    return _openai_client
+
+
+async def _reset_openai_client():
+    """Close the shared Azure OpenAI client and credential so the next call builds fresh ones."""
+    global _openai_client, _openai_credential, _token_refresh_task
+    
+    client, credential, task = _openai_client, _openai_credential, _token_refresh_task
+    _openai_client = _openai_credential = _token_refresh_task = None
+    
+    if task is not None:
+        task.cancel()
+    # Both own HTTP sessions that would otherwise leak on every rebuild
+    if client is not None:
+        await client.close()
+    if credential is not None:
+        await credential.close()
+
+
+async def _refresh_token_periodically(token_provider):
+    """
+    Keep the token provider's cache warm so renewals happen off the request path.
+    Runs in each worker that creates the client, since every worker has its own token cache.
+    """
+    while True:
+        await asyncio.sleep(_TOKEN_REFRESH_INTERVAL)
+        try:
+            await token_provider()
+        except Exception as e:
+            print(f"Background token refresh failed: {e}")
+
+
+def _build_system_prompt(services: list) -> str:
+    """Build the Azure OpenAI system prompt describing the available services."""
+    # Group services by provider for better context
+    providers = {}
+    for s in services:
+        provider = s.provider
+        if provider not in providers:
+            providers[provider] = []
+        providers[provider].append(s.resource_type)
+    
+    # Create a comprehensive but concise service summary
+    provider_summary = []
+    for provider, resource_types in sorted(providers.items()):
+        types_str = ", ".join(resource_types[:5])
+        if len(resource_types) > 5:
+            types_str += f" (+{len(resource_types) - 5} more)"
+        provider_summary.append(f"- {provider}: {types_str}")
+    
+    service_context = "\n".join(provider_summary)
+    
+    return f"""You are an Azure expert assistant helping users understand Azure services available in the Malaysia West region.
 
 IMPORTANT RULES:
 1. ONLY mention services that are explicitly listed below as available in Malaysia West
@@ -199,102 +473,290 @@ When answering:
 - Only suggest alternatives if they are explicitly in the list above
 - If asked about unavailable services, simply state they're not available - don't invent alternatives"""
 
-        # Call Azure OpenAI using the SDK
-        response = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": question}
-            ],
+
+async def _create_chat_completion(endpoint: str, question: str, services: list, **kwargs):
+    """Call Azure OpenAI with the services system prompt, rebuilding the client once on auth errors."""
+    deployment = os.environ.get("AZURE_OPENAI_DEPLOYMENT", "gpt-5.2-chat")
+    system_prompt = _system_prompt_cache if services is _services_cache else _build_system_prompt(services)
+    
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": question}
+    ]
+    
+    try:
+        return await _get_openai_client(endpoint).chat.completions.create(
+            messages=messages,
             max_completion_tokens=500,
-            model=deployment
+            model=deployment,
+            **kwargs
         )
-        
-        return response.choices[0].message.content
+    except ClientAuthenticationError:
+        # The cached credential could not get a token; rebuild it and retry once
+        await _reset_openai_client()
+        return await _get_openai_client(endpoint).chat.completions.create(
+            messages=messages,
+            max_completion_tokens=500,
+            model=deployment,
+            **kwargs
+        )
+
+
+def _answer_cache_key(question: str, services: list):
+    """Cache key for an AI answer, or None when services is not the cached list."""
+    if services is not _services_cache:
+        return None
+    return " ".join(question.lower().split()), _services_version
+
+
+def _get_cached_answer(key):
+    answer = _answer_cache.get(key) if key else None
+    if answer is not None:
+        _answer_cache.move_to_end(key)
+    return answer
+
+
+def _store_answer(key, answer: str):
+    if not key or not answer:
+        return
+    _answer_cache[key] = answer
+    _answer_cache.move_to_end(key)
+    if len(_answer_cache) > _ANSWER_CACHE_SIZE:
+        _answer_cache.popitem(last=False)
+
+
+async def get_ai_response(question: str, services: list) -> str:
+    """Generate AI response about Azure services in Malaysia West using Azure OpenAI."""
+    
+    # Get Azure OpenAI configuration from environment
+    endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
+    
+    if not endpoint:
+        # Fallback to rule-based response if no AI configured
+        return generate_simple_response(question, services)
+    
+    # Repeated questions are answered from the cache without another model call
+    key = _answer_cache_key(question, services)
+    answer = _get_cached_answer(key)
+    if answer is not None:
+        return answer
+    
+    try:
+        response = await _create_chat_completion(endpoint, question, services)
+        answer = response.choices[0].message.content
+        _store_answer(key, answer)
+        return answer
         
     except Exception as e:
         print(f"AI API error: {e}")
         return generate_simple_response(question, services)
 
 
+async def stream_ai_response(question: str, services: list):
+    """
+    Like get_ai_response, but yield the answer in pieces as Azure OpenAI produces them.
+    Falls back to a single rule-based answer if AI is not configured or the call fails.
+    """
+    endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
+    
+    if not endpoint:
+        yield generate_simple_response(question, services)
+        return
+    
+    key = _answer_cache_key(question, services)
+    answer = _get_cached_answer(key)
+    if answer is not None:
+        yield answer
+        return
+    
+    try:
+        stream = await _create_chat_completion(endpoint, question, services, stream=True)
+    except Exception as e:
+        print(f"AI API error: {e}")
+        yield generate_simple_response(question, services)
+        return
+    
+    deltas = []
+    try:
+        async for chunk in stream:
+            # Azure sends content-filter results as chunks without choices
+            if chunk.choices and chunk.choices[0].delta.content:
+                deltas.append(chunk.choices[0].delta.content)
+                yield deltas[-1]
+        _store_answer(key, "".join(deltas))
+    except Exception as e:
+        print(f"AI API streaming error: {e}")
+        yield "\n\n⚠️ The response was interrupted. Please try again."
+
+
+# Service-specific mappings for more precise searches
+# Maps common search terms to their actual Azure provider namespaces
+_SERVICE_MAPPINGS = {
+    'sql': frozenset({'microsoft.sql'}),
+    'azure sql': frozenset({'microsoft.sql'}),
+    'sql server': frozenset({'microsoft.sql'}),
+    'sql database': frozenset({'microsoft.sql'}),
+    'postgres': frozenset({'microsoft.dbforpostgresql'}),
+    'postgresql': frozenset({'microsoft.dbforpostgresql'}),
+    'mysql': frozenset({'microsoft.dbformysql'}),
+    'maria': frozenset({'microsoft.dbformariadb'}),
+    'mariadb': frozenset({'microsoft.dbformariadb'}),
+    'cosmos': frozenset({'microsoft.documentdb'}),
+    'cosmosdb': frozenset({'microsoft.documentdb'}),
+    'redis': frozenset({'microsoft.cache'}),
+    'kubernetes': frozenset({'microsoft.kubernetes', 'microsoft.containerservice'}),
+    'aks': frozenset({'microsoft.containerservice'}),
+    'container': frozenset({'microsoft.containerinstance', 'microsoft.containerregistry', 'microsoft.containerservice'}),
+    'vm': frozenset({'microsoft.compute'}),
+    'virtual machine': frozenset({'microsoft.compute'}),
+    'storage': frozenset({'microsoft.storage'}),
+    'blob': frozenset({'microsoft.storage'}),
+    'function': frozenset({'microsoft.web'}),
+    'functions': frozenset({'microsoft.web'}),
+    'app service': frozenset({'microsoft.web'}),
+    'logic app': frozenset({'microsoft.logic'}),
+    'key vault': frozenset({'microsoft.keyvault'}),
+    'keyvault': frozenset({'microsoft.keyvault'}),
+    'cognitive': frozenset({'microsoft.cognitiveservices'}),
+    'ai': frozenset({'microsoft.cognitiveservices', 'microsoft.machinelearningservices'}),
+    'machine learning': frozenset({'microsoft.machinelearningservices'}),
+    'event hub': frozenset({'microsoft.eventhub'}),
+    'eventhub': frozenset({'microsoft.eventhub'}),
+    'service bus': frozenset({'microsoft.servicebus'}),
+    'servicebus': frozenset({'microsoft.servicebus'}),
+}
+
+# Common words ignored when extracting keywords from a query
+_STOP_WORDS = frozenset({
+    'is', 'are', 'the', 'a', 'an', 'in', 'available', 'does', 'do', 'can', 'i', 'use',
+    'deploy', 'what', 'which', 'how', 'about', 'tell', 'me', 'show', 'get', 'have',
+    'malaysia', 'west', 'region', 'azure', 'service', 'services',
+})
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Query keywords keep dots and slashes so qualified names like "microsoft.web/sites" stay whole
+_KEYWORD_RE = re.compile(r"[a-z0-9][a-z0-9./]*")
+
+
+class _SearchIndex:
+    """
+    Lowercased display names plus inverted indexes (token/provider -> service positions)
+    over a services list.
+    """
+    
+    def __init__(self, services: list):
+        self.display_names = [s.lc_display for s in services]
+        self.tokens = {}
+        self.providers = {}
+        self._keyword_matches = {}
+        
+        for i, service in enumerate(services):
+            self.providers.setdefault(service.lc_provider, []).append(i)
+            for token in _WORD_RE.findall(service.lc_display):
+                self.tokens.setdefault(token, set()).add(i)
+        
+        # The token vocabulary as one newline-separated string, for Aho-Corasick scans
+        self._vocabulary = list(self.tokens)
+        self._vocabulary_text = "\n".join(self._vocabulary)
+        self._token_starts = [0]
+        for token in self._vocabulary[:-1]:
+            self._token_starts.append(self._token_starts[-1] + len(token) + 1)
+    
+    def match_keywords(self, keywords: list) -> set:
+        """Return positions of services whose provider or resource type contains any keyword."""
+        found = {}
+        missing = [k for k in dict.fromkeys(keywords) if k not in self._keyword_matches]
+        if missing:
+            found = self._scan_automaton(missing) if ahocorasick else self._scan_tokens(missing)
+            if len(self._keyword_matches) < 1024:
+                self._keyword_matches.update(found)
+        
+        return set().union(*(found[k] if k in found else self._keyword_matches[k] for k in keywords))
+    
+    def _scan_tokens(self, keywords: list) -> dict:
+        # Keywords are alphanumeric, so a substring match always falls within one token
+        return {
+            keyword: set().union(*(ids for token, ids in self.tokens.items() if keyword in token))
+            for keyword in keywords
+        }
+    
+    def _scan_automaton(self, keywords: list) -> dict:
+        # One pass over the vocabulary finds every keyword occurrence in every token
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        
+        found = {keyword: set() for keyword in keywords}
+        for end, keyword in automaton.iter(self._vocabulary_text):
+            token = self._vocabulary[bisect.bisect_right(self._token_starts, end) - 1]
+            found[keyword] |= self.tokens[token]
+        return found
+
+
+def _search_index_for(services: list) -> _SearchIndex:
+    """Return the prebuilt index for the cached services, or build one for another list."""
+    return _search_index if services is _services_cache else _SearchIndex(services)
+
+
 def search_services(query: str, services: list) -> list:
     """
     Search services dynamically based on query keywords.
     Returns matching services from the services list.
     """
     query_lower = query.lower()
-    
-    # Service-specific mappings for more precise searches
-    # Maps common search terms to their actual Azure provider namespaces
-    service_mappings = {
-        'sql': ['microsoft.sql'],
-        'azure sql': ['microsoft.sql'],
-        'sql server': ['microsoft.sql'],
-        'sql database': ['microsoft.sql'],
-        'postgres': ['microsoft.dbforpostgresql'],
-        'postgresql': ['microsoft.dbforpostgresql'],
-        'mysql': ['microsoft.dbformysql'],
-        'maria': ['microsoft.dbformariadb'],
-        'mariadb': ['microsoft.dbformariadb'],
-        'cosmos': ['microsoft.documentdb'],
-        'cosmosdb': ['microsoft.documentdb'],
-        'redis': ['microsoft.cache'],
-        'kubernetes': ['microsoft.kubernetes', 'microsoft.containerservice'],
-        'aks': ['microsoft.containerservice'],
-        'container': ['microsoft.containerinstance', 'microsoft.containerregistry', 'microsoft.containerservice'],
-        'vm': ['microsoft.compute'],
-        'virtual machine': ['microsoft.compute'],
-        'storage': ['microsoft.storage'],
-        'blob': ['microsoft.storage'],
-        'function': ['microsoft.web'],
-        'functions': ['microsoft.web'],
-        'app service': ['microsoft.web'],
-        'logic app': ['microsoft.logic'],
-        'key vault': ['microsoft.keyvault'],
-        'keyvault': ['microsoft.keyvault'],
-        'cognitive': ['microsoft.cognitiveservices'],
-        'ai': ['microsoft.cognitiveservices', 'microsoft.machinelearningservices'],
-        'machine learning': ['microsoft.machinelearningservices'],
-        'event hub': ['microsoft.eventhub'],
-        'eventhub': ['microsoft.eventhub'],
-        'service bus': ['microsoft.servicebus'],
-        'servicebus': ['microsoft.servicebus'],
-    }
+    index = _search_index_for(services)
     
     # Check if query matches any specific service mapping
-    for term, providers in service_mappings.items():
+    for term, providers in _SERVICE_MAPPINGS.items():
         if term in query_lower:
-            matches = []
-            for service in services:
-                provider_lower = service["provider"].lower()
-                if provider_lower in providers:
-                    matches.append(service)
-            if matches:
-                return matches
-    
-    # Extract keywords from the query (remove common words)
-    stop_words = {'is', 'are', 'the', 'a', 'an', 'in', 'available', 'does', 'do', 'can', 'i', 'use', 
-                  'deploy', 'what', 'which', 'how', 'about', 'tell', 'me', 'show', 'get', 'have',
-                  'malaysia', 'west', 'region', 'azure', 'service', 'services'}
-    
-    words = query_lower.replace('?', '').replace(',', '').split()
-    keywords = [w for w in words if w not in stop_words and len(w) > 2]
-    
-    # Search through services
-    matches = []
-    for service in services:
-        display_name_lower = service["display_name"].lower()
-        provider_lower = service["provider"].lower()
-        resource_type_lower = service["resource_type"].lower()
-        
-        # Check if any keyword matches
-        for keyword in keywords:
-            if (keyword in display_name_lower or 
-                keyword in provider_lower or 
-                keyword in resource_type_lower):
-                matches.append(service)
-                break
+            positions = sorted(i for p in providers for i in index.providers.get(p, ()))
+            if positions:
+                return [services[i] for i in positions]
+    
+    # Extract keywords from the query (remove common words and trailing punctuation)
+    words = (w.rstrip("./") for w in _KEYWORD_RE.findall(query_lower))
+    keywords = [w for w in words if w not in _STOP_WORDS and len(w) > 2]
+    
+    # Plain words go through the token index; qualified names are matched against display names
+    qualified = [k for k in keywords if "." in k or "/" in k]
+    positions = index.match_keywords([k for k in keywords if k not in qualified])
+    if qualified:
+        positions.update(
+            i for i, name in enumerate(index.display_names) if any(k in name for k in qualified)
+        )
     
-    return matches
+    # Preserve the original order
+    return [services[i] for i in sorted(positions)]
+
+
+# Greetings recognized when they are the whole message (optionally ending in "!" or ".")
+_GREETINGS = frozenset({
+    'hi', 'hello', 'hey', 'hi there', 'hello there', 'hey there',
+    'good morning', 'good afternoon', 'good evening', 'howdy',
+    'greetings', 'hiya', 'yo', 'sup', "what's up", 'whats up',
+})
+
+# Casual phrases recognized anywhere in the message, dispatched on the matching group name.
+# When several kinds appear, the reply follows _CASUAL_PRIORITY rather than position.
+_CASUAL_RE = re.compile(
+    r"\b(?:"
+    r"(?P<how_are_you>how are you|how's it going|what's going on)"
+    r"|(?P<thanks>thank you|thanks|thx|ty|appreciate it|cheers)"
+    r"|(?P<help>help|what can you do|what do you do|how does this work)"
+    r")\b"
+)
+
+_CASUAL_PRIORITY = ('how_are_you', 'thanks', 'help')
+
+_GREETING_RESPONSE = "👋 Hello! I'm here to help you explore Azure services available in the Malaysia West region. You can ask me questions like:\n\n• What services are available?\n• Is Azure SQL available?\n• Tell me about container services\n• How many services are there?\n\nWhat would you like to know?"
+
+_CASUAL_RESPONSES = {
+    'how_are_you': "😊 I'm doing great, thanks for asking! I'm ready to help you explore Azure services in the Malaysia West region. What would you like to know about?",
+    'thanks': "You're welcome! 😊 Feel free to ask if you have more questions about Azure services in Malaysia West.",
+    'help': "🤖 I'm an Azure Services Explorer for the Malaysia West region. I can help you:\n\n• Find out which Azure services are available in Malaysia West\n• Search for specific services (e.g., 'storage', 'compute', 'AI')\n• Get service counts and summaries\n• Answer questions about Azure capabilities in this region\n\nJust type your question and I'll do my best to help!",
+}
 
 
 def is_casual_conversation(question: str) -> tuple[bool, str]:
@@ -304,33 +766,15 @@ def is_casual_conversation(question: str) -> tuple[bool, str]:
     """
     question_lower = question.lower().strip()
     
-    # Common greetings and casual phrases
-    greetings = ['hi', 'hello', 'hey', 'hi there', 'hello there', 'hey there', 
-                 'good morning', 'good afternoon', 'good evening', 'howdy',
-                 'greetings', 'hiya', 'yo', 'sup', "what's up", 'whats up']
-    
-    # Check for exact matches or close matches
-    for greeting in greetings:
-        if question_lower == greeting or question_lower == greeting + '!' or question_lower == greeting + '.':
-            return True, "👋 Hello! I'm here to help you explore Azure services available in the Malaysia West region. You can ask me questions like:\n\n• What services are available?\n• Is Azure SQL available?\n• Tell me about container services\n• How many services are there?\n\nWhat would you like to know?"
-    
-    # Handle "how are you" type questions
-    how_are_you = ['how are you', "how's it going", 'how are you doing', "what's going on"]
-    for phrase in how_are_you:
-        if phrase in question_lower:
-            return True, "😊 I'm doing great, thanks for asking! I'm ready to help you explore Azure services in the Malaysia West region. What would you like to know about?"
-    
-    # Handle thanks/gratitude
-    thanks = ['thank you', 'thanks', 'thx', 'ty', 'appreciate it', 'cheers']
-    for phrase in thanks:
-        if phrase in question_lower:
-            return True, "You're welcome! 😊 Feel free to ask if you have more questions about Azure services in Malaysia West."
-    
-    # Handle help requests
-    help_phrases = ['help', 'what can you do', 'what do you do', 'how does this work']
-    for phrase in help_phrases:
-        if phrase in question_lower:
-            return True, "🤖 I'm an Azure Services Explorer for the Malaysia West region. I can help you:\n\n• Find out which Azure services are available in Malaysia West\n• Search for specific services (e.g., 'storage', 'compute', 'AI')\n• Get service counts and summaries\n• Answer questions about Azure capabilities in this region\n\nJust type your question and I'll do my best to help!"
+    # Check for exact greetings, allowing one trailing "!" or "."
+    if question_lower in _GREETINGS or (question_lower[-1:] in ('!', '.') and question_lower[:-1] in _GREETINGS):
+        return True, _GREETING_RESPONSE
+    
+    # Handle "how are you", thanks and help phrases
+    found = {match.lastgroup for match in _CASUAL_RE.finditer(question_lower)}
+    for kind in _CASUAL_PRIORITY:
+        if kind in found:
+            return True, _CASUAL_RESPONSES[kind]
     
     return False, ""
 
@@ -345,19 +789,14 @@ def generate_simple_response(question: str, services: list) -> str:
         return casual_response
     
     # Handle general queries
+    grouped = _grouped_cache if services is _services_cache else _group_by_provider(services)
+    
     if "how many" in question_lower:
-        providers = set(s["provider"] for s in services)
-        return f"There are {len(services)} Azure resource types available in Malaysia West from {len(providers)} different providers."
+        return f"There are {len(services)} Azure resource types available in Malaysia West from {len(grouped)} different providers."
     
     if "list all" in question_lower or "show all" in question_lower:
-        providers = {}
-        for service in services:
-            provider = service["provider"]
-            if provider not in providers:
-                providers[provider] = 0
-            providers[provider] += 1
-        provider_summary = [f"• {p}: {count} resource types" for p, count in list(providers.items())[:15]]
-        return f"There are {len(services)} resource types from {len(providers)} providers available in Malaysia West:\n\n" + "\n".join(provider_summary) + "\n\n...and more."
+        provider_summary = [f"• {p}: {len(items)} resource types" for p, items in list(grouped.items())[:15]]
+        return f"There are {len(services)} resource types from {len(grouped)} providers available in Malaysia West:\n\n" + "\n".join(provider_summary) + "\n\n...and more."
     
     # Search for specific services based on the query
     matches = search_services(question, services)
@@ -366,15 +805,15 @@ def generate_simple_response(question: str, services: list) -> str:
         # Group matches by provider
         providers = {}
         for match in matches:
-            provider = match["provider"]
+            provider = match.provider
             if provider not in providers:
                 providers[provider] = []
-            providers[provider].append(match["resource_type"])
+            providers[provider].append(match.resource_type)
         
         # Build response
         if len(matches) == 1:
             m = matches[0]
-            return f"✅ Yes! **{m['display_name']}** is available in Malaysia West."
+            return f"✅ Yes! **{m.display_name}** is available in Malaysia West."
         elif len(matches) <= 10:
             response = f"✅ Found {len(matches)} matching services in Malaysia West:\n\n"
             for provider, resource_types in providers.items():
@@ -396,105 +835,129 @@ def generate_simple_response(question: str, services: list) -> str:
         return f"❌ No services matching your query were found in Malaysia West. Try searching for specific terms like 'container', 'sql', 'storage', 'compute', etc."
 
 
+def _json(payload, status: int = 200) -> Response:
+    """JSON response encoded with orjson."""
+    return Response(orjson.dumps(payload), status=status, mimetype="application/json")
+
+
 @app.route("/")
-def index():
+async def index():
     """Render the main page with services list."""
-    services = get_malaysia_west_services()
+    services = await get_services_async()
     
-    # Group by provider for better display
-    grouped = {}
-    for service in services:
-        provider = service["provider"]
-        if provider not in grouped:
-            grouped[provider] = []
-        grouped[provider].append(service)
-    
-    return render_template("index.html", 
-                         services=services, 
-                         grouped_services=grouped,
-                         total_count=len(services),
-                         provider_count=len(grouped))
+    # Provider grouping and counts are precomputed when the services cache is populated
+    return await render_template("index.html", 
+                                 services=services, 
+                                 grouped_services=_grouped_cache,
+                                 total_count=len(services),
+                                 provider_count=_provider_count_cache)
 
 
 @app.route("/api/services")
-def api_services():
+async def api_services():
     """API endpoint to get all services."""
-    services = get_malaysia_west_services()
-    return jsonify({
+    services = await get_services_async()
+    return _json({
         "region": "Malaysia West",
         "total_services": len(services),
-        "services": services
+        "services": [_service_to_dict(s) for s in services]
     })
 
 
 @app.route("/api/chat", methods=["POST"])
-def chat():
-    """API endpoint for chat functionality."""
-    data = request.get_json()
+async def chat():
+    """
+    API endpoint for chat functionality.
+    With "stream": true in the body (or ?stream=1), the answer is sent as server-sent events.
+    """
+    data = await request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return _json({"error": "Request body must be a JSON object"}, status=400)
+    
     question = data.get("question", "")
     
     if not question:
-        return jsonify({"error": "Question is required"}), 400
+        return _json({"error": "Question is required"}, status=400)
+    
+    services = await get_services_async()
+    
+    stream = data.get("stream") is True or request.args.get("stream", "").lower() in ("1", "true", "yes")
+    if stream:
+        async def generate():
+            async for delta in stream_ai_response(question, services):
+                yield b"data: " + orjson.dumps({"delta": delta}) + b"\n\n"
+            yield b"data: " + orjson.dumps({"done": True}) + b"\n\n"
+        
+        return Response(
+            generate(),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
     
-    services = get_malaysia_west_services()
-    response = get_ai_response(question, services)
+    response = await get_ai_response(question, services)
     
-    return jsonify({
+    return _json({
         "question": question,
         "answer": response
     })
 
 
 @app.route("/api/search")
-def search():
+async def search():
     """Search services by keyword."""
     query = request.args.get("q", "").lower()
-    services = get_malaysia_west_services()
+    services = await get_services_async()
     
     if not query:
-        return jsonify({"results": services})
+        return _json({"results": [_service_to_dict(s) for s in services]})
     
-    filtered = [s for s in services if query in s["display_name"].lower()]
-    return jsonify({
+    display_names = _search_index_for(services).display_names
+    filtered = [services[i] for i, name in enumerate(display_names) if query in name]
+    return _json({
         "query": query,
         "count": len(filtered),
-        "results": filtered
+        "results": [_service_to_dict(s) for s in filtered]
     })
 
 
 @app.route("/api/export/csv")
-def export_csv():
+async def export_csv():
     """
     Export services to CSV format.
     Equivalent to PowerShell: $results | Export-Csv -Path $outputCsv -NoTypeInformation
     """
     import csv
     from io import StringIO
-    from flask import Response
     
-    services = get_malaysia_west_services()
+    services = await get_services_async()
     
-    # Create CSV in memory
-    output = StringIO()
-    writer = csv.DictWriter(output, fieldnames=["ProviderNamespace", "ResourceType", "IsAvailableInMYW"])
-    writer.writeheader()
-    
-    for service in services:
-        writer.writerow({
-            "ProviderNamespace": service["provider"],
-            "ResourceType": service["resource_type"],
-            "IsAvailableInMYW": service.get("is_available", "Yes")
-        })
-    
-    # Return as downloadable CSV file
-    response = Response(
-        output.getvalue(),
+    async def generate():
+        # Serialize one row at a time through a small reusable buffer
+        buffer = StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=["ProviderNamespace", "ResourceType", "IsAvailableInMYW"])
+        
+        writer.writeheader()
+        yield buffer.getvalue()
+        
+        for service in services:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow({
+                "ProviderNamespace": service.provider,
+                "ResourceType": service.resource_type,
+                "IsAvailableInMYW": service.is_available
+            })
+            yield buffer.getvalue()
+    
+    # Stream as downloadable CSV file
+    return Response(
+        generate(),
         mimetype="text/csv",
         headers={"Content-Disposition": "attachment;filename=DeployableResourcesIn_MalaysiaWest.csv"}
     )
-    return response
 
 
 if __name__ == "__main__":
+    # Development server for local debugging only; production runs asgi:app under gunicorn
     port = int(os.environ.get("PORT", 8000))
     app.run(host="0.0.0.0", port=port, debug=True)
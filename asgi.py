@@ -0,0 +1,10 @@
+"""
+ASGI entry point for production servers.
+
+Loading the services here means `gunicorn --preload` fetches them once in the master
+process, and forked workers share the populated cache instead of each fetching it.
+"""
+
+from app import app, get_malaysia_west_services
+
+get_malaysia_west_services()
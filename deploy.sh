@@ -75,7 +75,7 @@ echo "Step 4: Configuring startup command..."
 az webapp config set \
     --name "$APP_NAME" \
     --resource-group "$RESOURCE_GROUP" \
-    --startup-file "gunicorn --bind=0.0.0.0 --timeout 600 app:app" \
+    --startup-file "startup.sh" \
     --output none
 
 echo "✅ Startup command configured"
@@ -1,2 +1,3 @@
 #!/bin/bash
-gunicorn --bind=0.0.0.0 --timeout 600 --workers=2 app:app
+# Single source of the production start command (used by deploy.sh and the README)
+gunicorn --preload --worker-class uvicorn_worker.UvicornWorker --workers=${WEB_CONCURRENCY:-2} --bind=0.0.0.0:${PORT:-8000} --timeout 600 asgi:app
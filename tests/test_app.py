@@ -0,0 +1,272 @@
+import asyncio
+import json
+import os
+import time
+import types
+
+import httpx
+import pytest
+
+os.environ.setdefault("SERVICES_CACHE_PATH", "")
+
+import app  # noqa: E402
+
+
+SERVICES = [
+    app._make_service(provider, resource_type, ["2023-01-01"])
+    for provider, resource_type in [
+        ("Microsoft.Web", "sites"),
+        ("Microsoft.Web", "serverFarms"),
+        ("Microsoft.Compute", "virtualMachines"),
+        ("Microsoft.Storage", "storageAccounts"),
+        ("Microsoft.KeyVault", "vaults"),
+    ]
+]
+
+
+def _display_names(matches):
+    return [s.display_name for s in matches]
+
+
+def test_search_qualified_name_matches_only_that_resource_type():
+    assert _display_names(app.search_services("tell me about Microsoft.Web/sites", SERVICES)) == [
+        "Microsoft.Web/sites"
+    ]
+    assert _display_names(app.search_services("microsoft.compute/virtualmachines", SERVICES)) == [
+        "Microsoft.Compute/virtualMachines"
+    ]
+
+
+def test_search_plain_keywords_match_substrings():
+    assert _display_names(app.search_services("any vaults or farms?", SERVICES)) == [
+        "Microsoft.Web/serverFarms",
+        "Microsoft.KeyVault/vaults",
+    ]
+
+
+def _post_chat(**kwargs):
+    async def post():
+        response = await app.app.test_client().post("/api/chat", **kwargs)
+        return response.status_code, await response.get_json()
+    
+    return asyncio.run(post())
+
+
+@pytest.mark.parametrize("kwargs", [{"data": "not json"}, {"json": ["a", "list"]}])
+def test_chat_rejects_non_object_bodies(kwargs):
+    status, body = _post_chat(**kwargs)
+    
+    assert status == 400
+    assert "error" in body
+
+
+def _mock_client(statuses, headers=None):
+    responses = iter(statuses)
+    requests = []
+    
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(next(responses), headers=headers or {}, json={"value": []})
+    
+    return httpx.Client(transport=httpx.MockTransport(handler)), requests
+
+
+def test_arm_get_retries_throttling_with_retry_after(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(app.time, "sleep", sleeps.append)
+    client, requests = _mock_client([429, 503, 200], headers={"Retry-After": "7"})
+    
+    response = app._get_with_retry(client, "https://management.azure.com/providers", None)
+    
+    assert response.status_code == 200
+    assert len(requests) == 3
+    assert sleeps == [7.0, 7.0]
+
+
+def test_arm_get_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(app.time, "sleep", lambda _: None)
+    client, requests = _mock_client([500] * (app.ARM_MAX_RETRIES + 1))
+    
+    with pytest.raises(httpx.HTTPStatusError):
+        app._get_with_retry(client, "https://management.azure.com/providers", None)
+    assert len(requests) == app.ARM_MAX_RETRIES + 1
+
+
+def test_arm_get_does_not_retry_client_errors(monkeypatch):
+    monkeypatch.setattr(app.time, "sleep", lambda _: None)
+    client, requests = _mock_client([403])
+    
+    with pytest.raises(httpx.HTTPStatusError):
+        app._get_with_retry(client, "https://management.azure.com/providers", None)
+    assert len(requests) == 1
+
+
+@pytest.mark.parametrize("question, kind", [
+    ("thanks, how are you?", "how_are_you"),
+    ("help me, thank you", "thanks"),
+    ("help, thanks", "thanks"),
+    ("can you help?", "help"),
+])
+def test_casual_reply_priority_is_how_are_you_then_thanks_then_help(question, kind):
+    assert app.is_casual_conversation(question) == (True, app._CASUAL_RESPONSES[kind])
+
+
+@pytest.fixture
+def cached_services():
+    app._cache_services(list(SERVICES))
+    yield app._services_cache
+    app._answer_cache.clear()
+
+
+def test_answer_cache_evicts_least_recently_used(cached_services, monkeypatch):
+    monkeypatch.setattr(app, "_ANSWER_CACHE_SIZE", 2)
+    first, second, third = (app._answer_cache_key(q, cached_services) for q in ("one", "two", "three"))
+    
+    app._store_answer(first, "1")
+    app._store_answer(second, "2")
+    assert app._get_cached_answer(first) == "1"  # now most recently used
+    app._store_answer(third, "3")
+    
+    assert app._get_cached_answer(second) is None
+    assert app._get_cached_answer(first) == "1"
+    assert app._get_cached_answer(third) == "3"
+
+
+def test_answer_cache_key_normalizes_question(cached_services):
+    assert app._answer_cache_key("  Is SQL\tavailable ", cached_services) == app._answer_cache_key(
+        "is sql available", cached_services
+    )
+    assert app._answer_cache_key("is sql available", list(SERVICES)) is None
+
+
+def test_answer_cache_is_cleared_when_services_are_replaced(cached_services):
+    key = app._answer_cache_key("is sql available", cached_services)
+    app._store_answer(key, "cached")
+    
+    app._cache_services(list(SERVICES))
+    
+    assert not app._answer_cache
+    assert app._answer_cache_key("is sql available", app._services_cache) != key
+
+
+def test_ai_answers_are_served_from_cache(cached_services, monkeypatch):
+    calls = []
+    
+    async def fake_completion(endpoint, question, services, **kwargs):
+        calls.append(question)
+        message = types.SimpleNamespace(content=f"answer {len(calls)}")
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+    
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com/")
+    monkeypatch.setattr(app, "_create_chat_completion", fake_completion)
+    
+    first = asyncio.run(app.get_ai_response("Is SQL available?", cached_services))
+    second = asyncio.run(app.get_ai_response("is sql  available?", cached_services))
+    
+    assert first == second == "answer 1"
+    assert calls == ["Is SQL available?"]
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    path = tmp_path / "services.json"
+    monkeypatch.setattr(app, "SERVICES_CACHE_PATH", str(path))
+    return path
+
+
+def test_disk_cache_round_trip(cache_path):
+    app._save_services_to_disk(SERVICES)
+    
+    assert app._load_services_from_disk() == SERVICES
+
+
+def test_disk_cache_expires_after_ttl(cache_path, monkeypatch):
+    app._save_services_to_disk(SERVICES)
+    monkeypatch.setattr(app, "SERVICES_CACHE_TTL", 60)
+    stale = time.time() - 61
+    os.utime(cache_path, (stale, stale))
+    
+    assert app._load_services_from_disk() is None
+
+
+@pytest.mark.parametrize("content", ["{not json", '[{"provider": "Microsoft.Web"}]', '"a string"'])
+def test_disk_cache_ignores_corrupt_files(cache_path, content):
+    cache_path.write_text(content, encoding="utf-8")
+    
+    assert app._load_services_from_disk() is None
+
+
+def test_disk_cache_write_failure_keeps_previous_file(cache_path, monkeypatch):
+    app._save_services_to_disk(SERVICES)
+    previous = cache_path.read_text(encoding="utf-8")
+    
+    def failing_dump(obj, f):
+        f.write("[partial")
+        raise OSError("disk full")
+    
+    monkeypatch.setattr(app.json, "dump", failing_dump)
+    app._save_services_to_disk(SERVICES[:1])
+    
+    assert cache_path.read_text(encoding="utf-8") == previous
+    assert list(cache_path.parent.iterdir()) == [cache_path]
+
+
+def test_disk_cache_disabled_by_empty_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "SERVICES_CACHE_PATH", "")
+    monkeypatch.chdir(tmp_path)
+    
+    app._save_services_to_disk(SERVICES)
+    
+    assert app._load_services_from_disk() is None
+    assert not list(tmp_path.iterdir())
+
+
+async def _fake_stream(question, services):
+    for delta in ("Hello", " world\n\nbye"):
+        yield delta
+
+
+def _chat_response(query_string="", body=None):
+    async def post():
+        client = app.app.test_client()
+        response = await client.post(
+            f"/api/chat{query_string}", json=body or {"question": "is sql available?"}
+        )
+        return response.status_code, response.mimetype, (await response.get_data()).decode()
+    
+    return asyncio.run(post())
+
+
+@pytest.mark.parametrize("query_string", ["", "?stream=0", "?stream=false", "?stream="])
+def test_chat_returns_json_unless_streaming_is_requested(cached_services, monkeypatch, query_string):
+    monkeypatch.delenv("AZURE_OPENAI_ENDPOINT", raising=False)
+    
+    status, mimetype, body = _chat_response(query_string)
+    
+    assert status == 200
+    assert mimetype == "application/json"
+    data = json.loads(body)
+    assert data["question"] == "is sql available?"
+    assert data["answer"]
+
+
+@pytest.mark.parametrize("query_string, body", [
+    ("?stream=1", None),
+    ("?stream=true", None),
+    ("", {"question": "is sql available?", "stream": True}),
+])
+def test_chat_streams_server_sent_events(cached_services, monkeypatch, query_string, body):
+    monkeypatch.setattr(app, "stream_ai_response", _fake_stream)
+    
+    status, mimetype, payload = _chat_response(query_string, body)
+    
+    assert status == 200
+    assert mimetype == "text/event-stream"
+    assert payload.endswith("\n\n")
+    frames = payload[:-2].split("\n\n")
+    assert all(frame.startswith("data: ") for frame in frames)
+    assert [json.loads(frame[len("data: "):]) for frame in frames] == [
+        {"delta": "Hello"},
+        {"delta": " world\n\nbye"},
+        {"done": True},
+    ]